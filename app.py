@@ -1,5 +1,6 @@
 import argparse
 import datetime
+import hmac
 import json
 import logging
 import os
@@ -8,6 +9,7 @@ import subprocess
 import sys
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from functools import wraps
 
 import cherrypy
@@ -33,6 +35,9 @@ app.secret_key = os.urandom(24)
 site_name = "PiKaraoke"
 admin_password = None
 
+# shared worker for delayed admin tasks (youtube-dl updates, system halts)
+admin_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="admin")
+
 def filename_from_path(file_path, remove_youtube_id=True):
     rc = os.path.basename(file_path)
     rc = os.path.splitext(rc)[0]
@@ -49,12 +54,17 @@ def url_escape(filename):
     return quote(filename.encode("utf8"))
 
 
+def is_admin_password(p):
+    # constant-time compare; encode so non-ascii passwords are accepted
+    return hmac.compare_digest(p.encode("utf-8"), admin_password.encode("utf-8"))
+
+
 def is_admin():
     if (admin_password == None):
         return True
     if ('admin' in request.cookies):
         a = request.cookies.get("admin")
-        if (a == admin_password):
+        if (is_admin_password(a)):
             return True
     return False
 
@@ -72,9 +82,8 @@ def home():
 
 @app.route("/auth", methods=["POST"])
 def auth():
-    d = request.form.to_dict()
-    p = d["admin-password"]
-    if (p == admin_password):
+    p = request.form.get("admin-password", "")
+    if (admin_password != None and is_admin_password(p)):
         resp = make_response(redirect('/'))
         expire_date = datetime.datetime.now()
         expire_date = expire_date + datetime.timedelta(days=90)
@@ -273,35 +282,28 @@ def browse():
         search = True
     page = request.args.get(get_page_parameter(), type=int, default=1)
 
-    available_songs = k.available_songs
+    if "sort" in request.args and request.args["sort"] == "date":
+        available_songs = k.get_available_songs_by_date()
+        sort_order = "Date"
+    else:
+        available_songs = k.available_songs
+        sort_order = "Alphabetical"
 
     letter = request.args.get('letter')
    
     if (letter):
-        result = []
-        if (letter == "numeric"):
-            for song in available_songs:
-                f = k.filename_from_path(song)[0]
-                if (f.isnumeric()):
-                    result.append(song)
-        else: 
-            for song in available_songs:
-                f = k.filename_from_path(song).lower()
-                if (f.startswith(letter.lower())):
-                    result.append(song)
+        result = k.get_available_songs_by_letter(letter)
+        if (sort_order == "Date"):
+            # the letter index is alphabetical, keep date order
+            letter_songs = set(result)
+            result = [song for song in available_songs if song in letter_songs]
         available_songs = result
 
-    if "sort" in request.args and request.args["sort"] == "date":
-        songs = sorted(available_songs, key=lambda x: os.path.getctime(x))
-        songs.reverse()
-        sort_order = "Date"
-    else:
-        songs = available_songs
-        sort_order = "Alphabetical"
+    songs = available_songs
     
     results_per_page = 500
     pagination = Pagination(css_framework='bulma', page=page, total=len(songs), search=search, record_name='songs', per_page=results_per_page)
-    start_index = (page - 1) * (results_per_page - 1)
+    start_index = (page - 1) * results_per_page
     return render_template(
         "files.html",
         pagination=pagination,
@@ -345,7 +347,13 @@ def download():
 
 @app.route("/qrcode")
 def qrcode():
-    return send_file(k.qr_code_path, mimetype="image/png")
+    # served from memory; browsers cache it and revalidate with If-None-Match
+    rv = make_response(k.qr_code_bytes)
+    rv.mimetype = "image/png"
+    rv.add_etag()
+    rv.cache_control.public = True
+    rv.cache_control.max_age = 3600
+    return rv.make_conditional(request)
 
 
 @app.route("/files/delete", methods=["GET"])
@@ -412,12 +420,21 @@ def edit_file():
         return redirect(url_for("browse"))
 
 
-@app.route("/info")
-def info():
-    url = "http://" + request.host
+# psutil samples are cached briefly so repeated /info loads don't re-read /proc
+system_stats_ttl = 2  # in seconds
+system_stats_cache = {"time": None, "stats": None}
+
+
+def get_system_stats():
+    now = time.monotonic()
+    if (
+        system_stats_cache["time"] != None
+        and now - system_stats_cache["time"] < system_stats_ttl
+    ):
+        return system_stats_cache["stats"]
 
     # cpu
-    cpu = str(psutil.cpu_percent()) + "%"
+    cpu = str(psutil.cpu_percent(interval=None)) + "%"
 
     # mem
     memory = psutil.virtual_memory()
@@ -446,6 +463,17 @@ def info():
         + "% )"
     )
 
+    system_stats_cache["stats"] = (cpu, memory, disk)
+    system_stats_cache["time"] = now
+    return system_stats_cache["stats"]
+
+
+@app.route("/info")
+def info():
+    url = "http://" + request.host
+
+    cpu, memory, disk = get_system_stats()
+
     # youtube-dl
     youtubedl_version = k.youtubedl_version
 
@@ -477,27 +505,34 @@ def delayed_halt(cmd):
     if cmd == 0:
         sys.exit()
     if cmd == 1:
-        os.system("shutdown now")
+        subprocess.Popen(["shutdown", "now"], close_fds=True)
     if cmd == 2:
-        os.system("reboot")
+        subprocess.Popen(["reboot"], close_fds=True)
     if cmd == 3:
-        process = subprocess.Popen(["raspi-config", "--expand-rootfs"])
-        process.wait()
-        os.system("reboot")
+        subprocess.call(["raspi-config", "--expand-rootfs"])
+        subprocess.Popen(["reboot"], close_fds=True)
+
+# held while a youtube-dl upgrade is running, so repeated clicks don't race each other
+ytdl_update_lock = threading.Lock()
 
 def update_youtube_dl():
-    time.sleep(3)
-    k.upgrade_youtubedl()
+    try:
+        time.sleep(3)
+        k.upgrade_youtubedl()
+    finally:
+        ytdl_update_lock.release()
 
 @app.route("/update_ytdl")
 def update_ytdl():
     if (is_admin()):
-        flash(
-            "Updating youtube-dl! Should take a minute or two... ",
-            "is-warning",
-        )
-        th = threading.Thread(target=update_youtube_dl)
-        th.start()
+        if ytdl_update_lock.acquire(blocking=False):
+            flash(
+                "Updating youtube-dl! Should take a minute or two... ",
+                "is-warning",
+            )
+            admin_pool.submit(update_youtube_dl)
+        else:
+            flash("youtube-dl is already being updated", "is-warning")
     else:
         flash("You don't have permission to update youtube-dl", "is-danger")
     return redirect(url_for("home"))
@@ -514,8 +549,7 @@ def refresh():
 def quit():
     if (is_admin()):
         flash("Quitting pikaraoke now!", "is-warning")
-        th = threading.Thread(target=delayed_halt, args=[0])
-        th.start()
+        admin_pool.submit(delayed_halt, 0)
     else:
         flash("You don't have permission to quit", "is-danger")
     return redirect(url_for("home"))
@@ -525,8 +559,7 @@ def quit():
 def shutdown():
     if (is_admin()): 
         flash("Shutting down system now!", "is-danger")
-        th = threading.Thread(target=delayed_halt, args=[1])
-        th.start()
+        admin_pool.submit(delayed_halt, 1)
     else:
         flash("You don't have permission to shut down", "is-danger")
     return redirect(url_for("home"))
@@ -536,8 +569,7 @@ def shutdown():
 def reboot():
     if (is_admin()): 
         flash("Rebooting system now!", "is-danger")
-        th = threading.Thread(target=delayed_halt, args=[2])
-        th.start()
+        admin_pool.submit(delayed_halt, 2)
     else:
         flash("You don't have permission to Reboot", "is-danger")
     return redirect(url_for("home"))
@@ -546,8 +578,7 @@ def reboot():
 def expand_fs():
     if (is_admin() and platform == "raspberry_pi"): 
         flash("Expanding filesystem and rebooting system now!", "is-danger")
-        th = threading.Thread(target=delayed_halt, args=[3])
-        th.start()
+        admin_pool.submit(delayed_halt, 3)
     elif (platform != "raspberry_pi"):
         flash("Cannot expand fs on non-raspberry pi devices!", "is-danger")
     else:
@@ -778,6 +809,9 @@ if __name__ == "__main__":
         logging.warning("Splash screen is disabled in developer mode due to main thread conflicts")
         args.hide_splash_screen = True
 
+    # prime psutil's cpu sampling so the first non-blocking read in /info is meaningful
+    psutil.cpu_percent(interval=None)
+
     # Configure karaoke process
     global k
     k = karaoke.Karaoke(
@@ -1,4 +1,3 @@
-import glob
 import json
 import logging
 import os
@@ -30,6 +29,8 @@ class Karaoke:
 
     queue = []
     available_songs = []
+    songs_by_date_cache = (None, None)  # (source available_songs list, sorted copy)
+    songs_by_letter_cache = (None, None)  # (source available_songs list, letter index)
     now_playing = None
     now_playing_filename = None
     now_playing_user = None
@@ -37,6 +38,7 @@ class Karaoke:
     is_paused = True
     process = None
     qr_code_path = None
+    qr_code_bytes = None
     base_path = os.path.dirname(__file__)
     volume_offset = 0
     loop_interval = 500  # in milliseconds
@@ -242,6 +244,9 @@ class Karaoke:
         img = qr.make_image()
         self.qr_code_path = os.path.join(self.base_path, "qrcode.png")
         img.save(self.qr_code_path)
+        # keep a copy in memory so the /qrcode route doesn't read the file per request
+        with open(self.qr_code_path, "rb") as f:
+            self.qr_code_bytes = f.read()
 
     def get_default_display_mode(self):
         if self.use_vlc:
@@ -446,12 +451,60 @@ class Karaoke:
 
     def get_available_songs(self):
         logging.debug("Fetching available songs in: " + self.download_path)
-        types = ('*.mp4', '*.MP4', '*.mp3', '*.MP3', '*.Mp3', '*.zip', '*.ZIP', '*.mkv', '*.MKV', '*.avi', '*.AVI', '*.webm', '*.WEBM', '*.mov', '*.MOV') 
+        types = ('.mp4', '.MP4', '.mp3', '.MP3', '.Mp3', '.zip', '.ZIP', '.mkv', '.MKV', '.avi', '.AVI', '.webm', '.WEBM', '.mov', '.MOV')
+        types = set(os.path.normcase(t) for t in types)
         files_grabbed = []
-        for files in types:
-            files_grabbed.extend(glob.glob(u"%s/**/%s" % (self.download_path, files), recursive=True))
+        # walk the tree once rather than running a recursive glob per file type.
+        # hidden files and directories are skipped, same as glob does
+        for dirpath, dirnames, filenames in os.walk(self.download_path, followlinks=True):
+            dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+            for f in filenames:
+                if f.startswith("."):
+                    continue
+                if os.path.normcase(os.path.splitext(f)[1]) in types:
+                    files_grabbed.append(os.path.join(dirpath, f))
         self.available_songs = sorted(files_grabbed, key=lambda f: str.lower(os.path.basename(f)))
 
+    # Update the song list in place of a full rescan of download_path. A new list is
+    # always assigned, which also invalidates the by-date and by-letter caches
+    def add_to_available_songs(self, song_path):
+        songs = self.available_songs + [song_path]
+        self.available_songs = sorted(songs, key=lambda f: str.lower(os.path.basename(f)))
+
+    def remove_from_available_songs(self, song_path):
+        self.available_songs = [s for s in self.available_songs if s != song_path]
+
+    def get_available_songs_by_date(self):
+        # newest first. The sorted copy is reused until available_songs is rescanned,
+        # so /browse doesn't stat every song on each request
+        available_songs = self.available_songs
+        source, songs = self.songs_by_date_cache
+        if source is not available_songs:
+            songs = sorted(available_songs, key=os.path.getctime, reverse=True)
+            self.songs_by_date_cache = (available_songs, songs)
+        return songs
+
+    def get_available_songs_by_letter(self, letter):
+        # songs are bucketed by first letter once per rescan, so /browse doesn't
+        # walk the whole library on each request. Buckets keep alphabetical order
+        available_songs = self.available_songs
+        source, index = self.songs_by_letter_cache
+        if source is not available_songs:
+            index = {"numeric": []}
+            for song in available_songs:
+                name = self.filename_from_path(song)
+                index.setdefault(name.lower()[:1], []).append(song)
+                if name[:1].isnumeric():
+                    index["numeric"].append(song)
+            self.songs_by_letter_cache = (available_songs, index)
+        if letter == "numeric":
+            return index["numeric"]
+        letter = letter.lower()
+        songs = index.get(letter[:1], [])
+        if len(letter) > 1:
+            songs = [s for s in songs if self.filename_from_path(s).lower().startswith(letter)]
+        return songs
+
     def delete(self, song_path):
         logging.info("Deleting song: " + song_path)
         os.remove(song_path)
@@ -461,7 +514,7 @@ class Karaoke:
         if (os.path.exists(cdg_file)):
             os.remove(cdg_file)
         
-        self.get_available_songs()
+        self.remove_from_available_songs(song_path)
 
     def rename(self, song_path, new_name):
         logging.info("Renaming song: '" + song_path + "' to: " + new_name)
@@ -473,7 +526,8 @@ class Karaoke:
         cdg_file = song_path.replace(ext[1],".cdg")
         if (os.path.exists(cdg_file)):
             os.rename(cdg_file, self.download_path + new_name + ".cdg")
-        self.get_available_songs()
+        self.remove_from_available_songs(song_path)
+        self.add_to_available_songs(self.download_path + new_file_name)
 
     def filename_from_path(self, file_path):
         rc = os.path.basename(file_path)
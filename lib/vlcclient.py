@@ -37,6 +37,10 @@ class VLCClient:
         self.port = port
         self.http_endpoint = "http://localhost:%s/requests/status.xml" % self.port
         self.http_command_endpoint = self.http_endpoint + "?command="
+        # reuse one keep-alive connection for the frequent status/command polls
+        self.http_session = requests.Session()
+        self.http_session.auth = ("", self.http_password)
+        self.http_timeout = 5  # in seconds, so a hung VLC can't stall a request thread
         self.is_transposing = False
 
         self.qrcode = qrcode
@@ -202,7 +206,7 @@ class VLCClient:
     def command(self, command):
         if self.is_running():
             url = self.http_command_endpoint + command
-            request = requests.get(url, auth=("", self.http_password))
+            request = self.http_session.get(url, timeout=self.http_timeout)
             return request
         else:
             logging.error("No active VLC process. Could not run command: " + command)
@@ -269,7 +273,7 @@ class VLCClient:
 
     def get_status(self):
         url = self.http_endpoint
-        request = requests.get(url, auth=("", self.http_password))
+        request = self.http_session.get(url, timeout=self.http_timeout)
         return ET.fromstring(request.text)
 
     def run(self):